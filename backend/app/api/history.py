@@ -1,12 +1,197 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
 from pydantic import BaseModel
 from app.database import get_db
 from app.models.database_models import Assessment
+from app.api.responses import (
+    ENCODINGS,
+    FastJSONResponse,
+    compress,
+    dumps,
+    encoded_response,
+    negotiate_encoding
+)
+import os
+import time
 import uuid
 
-router = APIRouter(prefix="/api/v1/history", tags=["history"])
+router = APIRouter(
+    prefix="/api/v1/history",
+    tags=["history"],
+    default_response_class=FastJSONResponse
+)
+
+# Memory bound for the in-process history cache
+HISTORY_CACHE_MAX_BYTES = int(os.getenv("HISTORY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# Expiry (seconds) for cached entries, a backstop for any missed invalidation
+HISTORY_CACHE_TTL = int(os.getenv("HISTORY_CACHE_TTL", "3600"))
+
+
+class LRUCache:
+    """
+    In-process LRU of serialized bodies, bounded by total bytes
+
+    Implements the get/set/delete interface HistoryCache expects from
+    a backend (the same signatures as a redis-py client, including the
+    `ex` expiry argument of set).
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, Optional[float]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None):
+        if len(value) > self.max_bytes:
+            return
+        self.delete(key)
+        expires_at = time.monotonic() + ex if ex else None
+        self._entries[key] = (value, expires_at)
+        self.size += len(value)
+        while self.size > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def delete(self, *keys: str):
+        for key in keys:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= len(entry[0])
+
+    def stats(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions
+        }
+
+
+class HistoryCache:
+    """
+    Per-user cache of serialized history and stats responses
+
+    Bodies are stored already compressed, keyed by the negotiated
+    content coding, so a hit costs no serialization or compression.
+    The coding actually applied (small bodies stay "identity") is
+    stored in front of the body.
+
+    Each user has a generation token that is part of every entry key.
+    Readers fetch the token before querying the database and store the
+    result under it; invalidate() replaces the token. A body computed
+    from data read before a concurrent save therefore lands under a
+    retired key and is never served, even with a shared backend. The
+    token is random rather than a counter so a lost (evicted/expired)
+    token can never resurrect old entries. Entries also expire after
+    HISTORY_CACHE_TTL.
+
+    Uses an in-process LRUCache by default; pass any backend with
+    get/set(ex=)/delete (e.g. a shared redis.Redis) to share it across
+    workers. Hit/miss counters are kept per worker process.
+    """
+
+    KINDS = ("assessments", "stats")
+
+    def __init__(self, backend=None, ttl: int = HISTORY_CACHE_TTL):
+        self.backend = backend if backend is not None else LRUCache(HISTORY_CACHE_MAX_BYTES)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(kind: str, user_id: str, generation: str, encoding: str) -> str:
+        return f"history:{kind}:{user_id}:{generation}:{encoding}"
+
+    @staticmethod
+    def generation_key(user_id: str) -> str:
+        return f"history:generation:{user_id}"
+
+    def generation(self, user_id: str) -> str:
+        """Current generation token for a user, created on first use"""
+        token = self.backend.get(self.generation_key(user_id))
+        if token is None:
+            token = uuid.uuid4().hex.encode()
+            self.backend.set(self.generation_key(user_id), token, ex=self.ttl)
+        return token.decode()
+
+    def get(
+        self,
+        kind: str,
+        user_id: str,
+        generation: str,
+        encoding: str
+    ) -> Optional[Tuple[bytes, str]]:
+        """
+        Cached response for a negotiated encoding
+
+        Returns:
+            Tuple of (body, content coding applied to it), or None on a miss
+        """
+        value = self.backend.get(self.key(kind, user_id, generation, encoding))
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        content_encoding, _, body = value.partition(b":")
+        return body, content_encoding.decode()
+
+    def set(
+        self,
+        kind: str,
+        user_id: str,
+        generation: str,
+        encoding: str,
+        body: bytes,
+        content_encoding: str
+    ):
+        value = content_encoding.encode() + b":" + body
+        self.backend.set(self.key(kind, user_id, generation, encoding), value, ex=self.ttl)
+
+    def invalidate(self, user_id: str):
+        """Retire the user's generation so no cached response is served again"""
+        old = self.backend.get(self.generation_key(user_id))
+        self.backend.set(self.generation_key(user_id), uuid.uuid4().hex.encode(), ex=self.ttl)
+        if old is not None:
+            # Free the retired entries now rather than waiting for the TTL
+            self.backend.delete(*[
+                self.key(kind, user_id, old.decode(), encoding)
+                for kind in self.KINDS
+                for encoding in ENCODINGS
+            ])
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        stats = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            # Counters cover this worker only, even with a shared backend
+            "counter_scope": "process",
+            "worker_pid": os.getpid()
+        }
+        if isinstance(self.backend, LRUCache):
+            stats.update(self.backend.stats())
+        return stats
+
+
+# Global instance (replace .backend to plug in a shared or test store)
+history_cache = HistoryCache()
 
 class SaveAssessmentRequest(BaseModel):
     input_data: dict
@@ -43,6 +228,7 @@ async def save_assessment(
         
         db.add(assessment)
         db.commit()
+        history_cache.invalidate(user_id)
         db.refresh(assessment)
         
         return {
@@ -58,80 +244,119 @@ async def save_assessment(
 @router.get("/user/{user_id}")
 async def get_user_history(
     user_id: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Get all assessments for an anonymous user
+    
+    Large histories are gzip/brotli compressed per Accept-Encoding.
+    Served from the per-user cache until the user's history changes.
     """
     try:
-        assessments = db.query(Assessment).filter(
-            Assessment.user_id == user_id
-        ).order_by(Assessment.created_at.desc()).all()
+        encoding = negotiate_encoding(request)
+        generation = history_cache.generation(user_id)
+        cached = history_cache.get("assessments", user_id, generation, encoding)
+        if cached is None:
+            assessments = db.query(Assessment).filter(
+                Assessment.user_id == user_id
+            ).order_by(Assessment.created_at.desc()).all()
+            
+            cached = compress(dumps({
+                "status": "success",
+                "count": len(assessments),
+                "assessments": [assessment.to_dict() for assessment in assessments]
+            }), encoding)
+            history_cache.set("assessments", user_id, generation, encoding, *cached)
         
+        return encoded_response(*cached)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch history: {str(e)}")
+
+
+def _calculate_user_stats(user_id: str, db: Session) -> Dict:
+    """Statistics and trends for a user, computed from the database"""
+    assessments = db.query(Assessment).filter(
+        Assessment.user_id == user_id
+    ).order_by(Assessment.created_at.asc()).all()
+    
+    if not assessments:
         return {
             "status": "success",
-            "count": len(assessments),
-            "assessments": [assessment.to_dict() for assessment in assessments]
+            "message": "No assessments found",
+            "stats": None
         }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to fetch history: {str(e)}")
+    
+    # Calculate statistics
+    total = len(assessments)
+    predictions = [a.prediction for a in assessments]
+    at_risk_count = predictions.count("At Risk")
+    moderate_count = predictions.count("Moderate")
+    balanced_count = predictions.count("Balanced")
+    
+    # Get trend (improvement/decline)
+    if len(assessments) >= 2:
+        first = assessments[0].prediction
+        last = assessments[-1].prediction
+        
+        score_map = {"At Risk": 1, "Moderate": 2, "Balanced": 3}
+        trend = "improving" if score_map[last] > score_map[first] else \
+               "declining" if score_map[last] < score_map[first] else "stable"
+    else:
+        trend = "insufficient_data"
+    
+    return {
+        "status": "success",
+        "stats": {
+            "total_assessments": total,
+            "at_risk_count": at_risk_count,
+            "moderate_count": moderate_count,
+            "balanced_count": balanced_count,
+            "trend": trend,
+            "latest_prediction": assessments[-1].prediction,
+            "first_assessment": assessments[0].created_at.isoformat(),
+            "latest_assessment": assessments[-1].created_at.isoformat()
+        }
+    }
 
 
 @router.get("/stats/{user_id}")
 async def get_user_stats(
     user_id: str,
+    request: Request,
     db: Session = Depends(get_db)
 ):
     """
     Get statistics and trends for a user
+    
+    Served from the per-user cache until the user's history changes.
     """
     try:
-        assessments = db.query(Assessment).filter(
-            Assessment.user_id == user_id
-        ).order_by(Assessment.created_at.asc()).all()
-        
-        if not assessments:
-            return {
-                "status": "success",
-                "message": "No assessments found",
-                "stats": None
-            }
-        
-        # Calculate statistics
-        total = len(assessments)
-        predictions = [a.prediction for a in assessments]
-        at_risk_count = predictions.count("At Risk")
-        moderate_count = predictions.count("Moderate")
-        balanced_count = predictions.count("Balanced")
-        
-        # Get trend (improvement/decline)
-        if len(assessments) >= 2:
-            first = assessments[0].prediction
-            last = assessments[-1].prediction
-            
-            score_map = {"At Risk": 1, "Moderate": 2, "Balanced": 3}
-            trend = "improving" if score_map[last] > score_map[first] else \
-                   "declining" if score_map[last] < score_map[first] else "stable"
-        else:
-            trend = "insufficient_data"
+        encoding = negotiate_encoding(request)
+        generation = history_cache.generation(user_id)
+        cached = history_cache.get("stats", user_id, generation, encoding)
+        if cached is None:
+            cached = compress(dumps(_calculate_user_stats(user_id, db)), encoding)
+            history_cache.set("stats", user_id, generation, encoding, *cached)
         
-        return {
-            "status": "success",
-            "stats": {
-                "total_assessments": total,
-                "at_risk_count": at_risk_count,
-                "moderate_count": moderate_count,
-                "balanced_count": balanced_count,
-                "trend": trend,
-                "latest_prediction": assessments[-1].prediction,
-                "first_assessment": assessments[0].created_at.isoformat(),
-                "latest_assessment": assessments[-1].created_at.isoformat()
-            }
-        }
+        return encoded_response(*cached)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to calculate stats: {str(e)}")
 
 
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Get history cache metrics (hit rate, entries, memory use)
+    
+    Hit/miss counters are for the worker that answers (see worker_pid).
+    """
+    return {
+        "status": "success",
+        "cache": history_cache.stats()
+    }
+
+
 @router.delete("/user/{user_id}")
 async def delete_user_history(
     user_id: str,
@@ -146,6 +371,7 @@ async def delete_user_history(
         ).delete()
         
         db.commit()
+        history_cache.invalidate(user_id)
         
         return {
             "status": "success",
@@ -0,0 +1,117 @@
+"""
+Response helpers: fast JSON encoding, ETag revalidation and compression
+"""
+import gzip
+import json
+from typing import Any, Tuple
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+
+# Bodies smaller than this are sent uncompressed (not worth the CPU)
+MIN_COMPRESS_SIZE = 1024
+
+# Content codings negotiate_encoding() can choose, in order of preference
+ENCODINGS = ("br", "gzip", "identity")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with dumps() instead of json.dumps"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110)"""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def etag_response(request: Request, body: bytes, etag: str) -> Response:
+    """
+    Serve a pre-serialized JSON body with a strong ETag
+
+    Returns 304 Not Modified when the client already has this version.
+    Clients must revalidate (no-cache) since the body changes with the model.
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    """Content codings from an Accept-Encoding header, minus any with q=0"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, *params = [piece.strip().lower() for piece in part.split(";")]
+        weights = [float(p[2:]) for p in params if p.startswith("q=") and p[2:].replace(".", "", 1).isdigit()]
+        if coding and not (weights and weights[0] == 0):
+            accepted.add(coding)
+    return accepted
+
+
+def negotiate_encoding(request: Request) -> str:
+    """Preferred coding (one of ENCODINGS) the client accepts; brotli only when installed"""
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def compress(body: bytes, encoding: str) -> Tuple[bytes, str]:
+    """
+    Compress a serialized body with a negotiated coding
+
+    Returns:
+        Tuple of (body, coding actually applied). Small bodies are
+        returned as-is with "identity".
+    """
+    if len(body) < MIN_COMPRESS_SIZE or encoding == "identity":
+        return body, "identity"
+    if encoding == "br":
+        return brotli.compress(body, quality=4), "br"
+    return gzip.compress(body, compresslevel=5), "gzip"
+
+
+def encoded_response(body: bytes, encoding: str) -> Response:
+    """JSON response for a body already encoded with `encoding`"""
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def compressed_response(request: Request, content: Any) -> Response:
+    """
+    Serialize content and compress it per the Accept-Encoding header
+
+    Prefers brotli (when installed) over gzip. Small bodies are sent as-is.
+    Cached responses should store the output of compress() instead, so
+    the compression work is not repeated on every hit.
+    """
+    body = content if isinstance(content, bytes) else dumps(content)
+    return encoded_response(*compress(body, negotiate_encoding(request)))
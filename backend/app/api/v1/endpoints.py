@@ -1,18 +1,49 @@
 """
 API Endpoints for Digital Well-Being Predictor
 """
-from fastapi import APIRouter, HTTPException
+import os
+from fastapi import APIRouter, HTTPException, Request
 from app.api.v1.schemas import (
     PredictionRequest,
     PredictionResponse,
     HealthResponse,
     ModelInfoResponse,
-    FeaturesInfoResponse
+    FeaturesInfoResponse,
+    DriftResponse
 )
 from app.ml.model import get_predictor
+from app.ml.drift import get_drift_monitor, get_drift_reference
+from app.api.responses import dumps, etag_response
 
 router = APIRouter()
 
+FEATURES_INFO = {
+    "numeric_features": [
+        "Age",
+        "Daily_Screen_Time(hrs)",
+        "Sleep_Quality(1-10)",
+        "Stress_Level(1-10)",
+        "Days_Without_Social_Media",
+        "Exercise_Frequency(week)"
+    ],
+    "categorical_features": {
+        "Gender": ["Female", "Male", "Other"],
+        "Platform": ["Facebook", "Instagram", "LinkedIn", "TikTok", "X", "YouTube"]
+    }
+}
+
+# Pre-serialized bodies for read-only endpoints: name -> (model_version, body)
+_static_bodies = {}
+
+
+def _static_body(name: str, model_version: str, build) -> bytes:
+    """Validate and serialize a static payload once per model version"""
+    cached = _static_bodies.get(name)
+    if cached is None or cached[0] != model_version:
+        cached = (model_version, dumps(build().model_dump()))
+        _static_bodies[name] = cached
+    return cached[1]
+
 
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
@@ -59,6 +90,9 @@ async def predict_wellbeing(request: PredictionRequest):
         # Get recommendations
         recommendations = predictor.get_recommendations(prediction, input_data)
         
+        # Track input distribution for drift monitoring
+        get_drift_monitor().update(input_data)
+        
         return {
             "prediction": prediction,
             "confidence": confidence,
@@ -73,7 +107,7 @@ async def predict_wellbeing(request: PredictionRequest):
 
 
 @router.get("/model-info", response_model=ModelInfoResponse)
-async def get_model_info():
+async def get_model_info(request: Request):
     """
     Get model metadata and information
     
@@ -83,34 +117,58 @@ async def get_model_info():
     - Features count
     - Training accuracy
     - SMOTE balancing info
+    
+    The body is serialized once per model version and served with an
+    ETag, so unchanged clients get 304 Not Modified.
     """
     try:
         predictor = get_predictor()
-        return predictor.get_model_info()
+        body = _static_body(
+            "model-info",
+            predictor.model_version,
+            lambda: ModelInfoResponse(**predictor.get_model_info())
+        )
+        return etag_response(request, body, f'"model-info-{predictor.model_version}"')
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/features", response_model=FeaturesInfoResponse)
-async def get_features_info():
+async def get_features_info(request: Request):
     """
     Get information about model features
     
     Returns:
     - List of numeric features
     - Dictionary of categorical features with their possible values
+    
+    Served pre-serialized with an ETag, like /model-info.
     """
-    return {
-        "numeric_features": [
-            "Age",
-            "Daily_Screen_Time(hrs)",
-            "Sleep_Quality(1-10)",
-            "Stress_Level(1-10)",
-            "Days_Without_Social_Media",
-            "Exercise_Frequency(week)"
-        ],
-        "categorical_features": {
-            "Gender": ["Female", "Male", "Other"],
-            "Platform": ["Facebook", "Instagram", "LinkedIn", "TikTok", "X", "YouTube"]
-        }
-    }
+    try:
+        predictor = get_predictor()
+        body = _static_body(
+            "features",
+            predictor.model_version,
+            lambda: FeaturesInfoResponse(**FEATURES_INFO)
+        )
+        return etag_response(request, body, f'"features-{predictor.model_version}"')
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/monitoring/drift", response_model=DriftResponse)
+async def get_input_drift():
+    """
+    Get input drift scores against the training data
+    
+    Returns per-feature PSI and KL divergence of the /predict inputs
+    seen by this worker process, plus live vs training mean/std for
+    numeric features. PSI above 0.2 is flagged as drift; scores stay
+    null until the worker has seen enough predictions.
+    """
+    try:
+        scores = get_drift_monitor().scores(get_drift_reference())
+        scores["worker_pid"] = os.getpid()
+        return scores
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -2,7 +2,7 @@
 Pydantic schemas for request/response validation
 """
 from pydantic import BaseModel, Field, validator
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 
 class PredictionRequest(BaseModel):
@@ -98,3 +98,28 @@ class FeaturesInfoResponse(BaseModel):
     """Features information response"""
     numeric_features: List[str]
     categorical_features: Dict[str, List[str]]
+
+
+class FeatureDrift(BaseModel):
+    """Drift scores for a single input feature"""
+    psi: Optional[float] = Field(None, description="Population stability index vs training data")
+    kl_divergence: Optional[float] = Field(None, description="KL(live || training)")
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    reference_mean: Optional[float] = None
+    reference_std: Optional[float] = None
+
+
+class DriftResponse(BaseModel):
+    """Input drift monitoring response"""
+    samples: int = Field(..., description="Predictions seen by this worker")
+    reference_samples: int = Field(..., description="Rows in the training reference")
+    reference_source: str = Field(
+        ...,
+        description="training_rows (real training data) or smote_samples "
+                    "(SMOTE-balanced model samples, biased toward class balance)"
+    )
+    max_psi: Optional[float] = None
+    drift_detected: bool = Field(..., description="Any feature PSI above 0.2")
+    worker_pid: int
+    features: Dict[str, FeatureDrift]
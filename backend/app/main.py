@@ -6,6 +6,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1 import endpoints
 from app.api import history
 from app.ml.model import get_predictor
+from app.ml.drift import get_drift_reference
 from app.database import engine, Base
 
 # Create database tables
@@ -59,6 +60,13 @@ async def startup_event():
         print(f"📊 Ready to serve predictions!")
     except Exception as e:
         print(f"❌ Error loading model: {e}")
+        return
+    
+    try:
+        reference = get_drift_reference()
+        print(f"📈 Drift reference loaded ({reference.source})")
+    except Exception as e:
+        print(f"⚠️ Error loading drift reference: {e}")
 
 
 @app.get("/")
@@ -0,0 +1,201 @@
+"""
+Approximate Nearest-Neighbor Index
+Pure NumPy IVF (inverted file) index used in place of exact KNN search
+when the reference set is too large for brute-force lookups per request
+"""
+import numpy as np
+from typing import Optional, Tuple
+
+
+class IVFIndex:
+    """
+    Inverted-file index with a k-means coarse quantizer
+
+    Training points are bucketed by their nearest centroid. A query only
+    scans the points of its `nprobe` closest buckets, so raising `nprobe`
+    trades speed for recall (nprobe == n_lists is an exact search).
+
+    The index stores only row ids grouped by bucket, not the points
+    themselves: candidates are gathered from the model's own `_fit_X`,
+    which is attached after loading and excluded from the pickle.
+    """
+
+    def __init__(
+        self,
+        n_lists: Optional[int] = None,
+        nprobe: int = 8,
+        p: int = 2,
+        n_iter: int = 20,
+        random_state: int = 0
+    ):
+        self.n_lists = n_lists
+        # n_lists as configured (None = sqrt(n)), to detect config changes
+        self.requested_lists = n_lists
+        self.nprobe = nprobe
+        self.p = p
+        self.n_iter = n_iter
+        self.random_state = random_state
+        # Version of the model artifacts this index was built from
+        self.model_version = None
+        self.centroids = None
+        self.data = None
+        self.ids = None
+        self.offsets = None
+
+    @property
+    def n_samples(self) -> int:
+        return 0 if self.ids is None else len(self.ids)
+
+    @property
+    def n_features(self) -> int:
+        return 0 if self.centroids is None else self.centroids.shape[1]
+
+    def __getstate__(self):
+        # The reference points belong to the KNN model; don't pickle a copy
+        state = self.__dict__.copy()
+        state["data"] = None
+        return state
+
+    def attach(self, X: np.ndarray) -> "IVFIndex":
+        """Attach the reference points (the model's _fit_X) after loading"""
+        if X.shape != (self.n_samples, self.n_features):
+            raise ValueError(f"Expected points of shape {(self.n_samples, self.n_features)}, got {X.shape}")
+        self.data = X
+        return self
+
+    def fit(self, X: np.ndarray) -> "IVFIndex":
+        """
+        Train the coarse quantizer and bucket every row of X
+
+        Args:
+            X: Scaled reference points, shape (n_samples, n_features).
+               Kept by reference, not copied.
+
+        Returns:
+            The fitted index
+        """
+        n = len(X)
+        if self.n_lists is None:
+            # sqrt(n) lists is the usual IVF rule of thumb
+            self.n_lists = max(1, int(np.sqrt(n)))
+        self.n_lists = min(self.n_lists, n)
+
+        self.centroids = self._kmeans(X)
+        assignments = self._assign(X, self.centroids)
+
+        # Row ids grouped by list so each probe is a contiguous slice of ids
+        order = np.argsort(assignments, kind="stable")
+        self.data = X
+        self.ids = order.astype(np.int64)
+        counts = np.bincount(assignments, minlength=self.n_lists)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        return self
+
+    def search(
+        self,
+        Q: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the approximate k nearest neighbors of each query row
+
+        Args:
+            Q: Scaled query points, shape (n_queries, n_features)
+            k: Number of neighbors to return
+            nprobe: Lists to scan per query (defaults to self.nprobe)
+
+        Returns:
+            Tuple of (distances, indices), both shape (n_queries, k),
+            matching the layout of KNeighborsClassifier.kneighbors
+        """
+        if self.centroids is None:
+            raise ValueError("Index has not been fitted")
+        if self.data is None:
+            raise ValueError("Index has no reference points attached")
+
+        Q = np.atleast_2d(np.asarray(Q, dtype=np.float64))
+        k = min(k, self.n_samples)
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+
+        centroid_dist = self._sq_distances(Q, self.centroids)
+        probe_order = np.argsort(centroid_dist, axis=1)
+
+        distances = np.empty((len(Q), k), dtype=np.float64)
+        indices = np.empty((len(Q), k), dtype=np.int64)
+
+        for row, query in enumerate(Q):
+            lists = probe_order[row, :nprobe]
+            # Keep probing further lists until there are at least k candidates
+            n_probed = nprobe
+            while self._list_sizes(lists).sum() < k and n_probed < self.n_lists:
+                n_probed = min(n_probed * 2, self.n_lists)
+                lists = probe_order[row, :n_probed]
+
+            candidates = np.concatenate(
+                [self.ids[self.offsets[l]:self.offsets[l + 1]] for l in lists]
+            )
+            dist = self._distances(query, self.data[candidates])
+
+            top = np.argpartition(dist, k - 1)[:k] if len(dist) > k else np.arange(len(dist))
+            top = top[np.argsort(dist[top], kind="stable")]
+
+            distances[row] = dist[top]
+            indices[row] = candidates[top]
+
+        return distances, indices
+
+    def _list_sizes(self, lists: np.ndarray) -> np.ndarray:
+        return self.offsets[lists + 1] - self.offsets[lists]
+
+    def _distances(self, query: np.ndarray, points: np.ndarray) -> np.ndarray:
+        """Minkowski distance with the same p as the wrapped KNN model"""
+        diff = np.abs(points - query).astype(np.float64)
+        if self.p == 1:
+            return diff.sum(axis=1)
+        if self.p == 2:
+            return np.sqrt(np.einsum("ij,ij->i", diff, diff))
+        return (diff ** self.p).sum(axis=1) ** (1.0 / self.p)
+
+    @staticmethod
+    def _sq_distances(A: np.ndarray, B: np.ndarray) -> np.ndarray:
+        """Pairwise squared euclidean distances without materializing A - B"""
+        sq = (A * A).sum(axis=1)[:, None] - 2 * A @ B.T + (B * B).sum(axis=1)[None, :]
+        return np.maximum(sq, 0)
+
+    def _assign(self, X: np.ndarray, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """Nearest centroid for each row, chunked to bound memory"""
+        out = np.empty(len(X), dtype=np.int64)
+        for start in range(0, len(X), chunk_size):
+            chunk = X[start:start + chunk_size]
+            out[start:start + chunk_size] = self._sq_distances(chunk, centroids).argmin(axis=1)
+        return out
+
+    def _kmeans(self, X: np.ndarray) -> np.ndarray:
+        """Lloyd's k-means on a sample of X (256 points per list is plenty)"""
+        rng = np.random.default_rng(self.random_state)
+        sample_size = min(len(X), self.n_lists * 256)
+        sample = np.asarray(X[rng.choice(len(X), sample_size, replace=False)], dtype=np.float64)
+        centroids = sample[rng.choice(sample_size, self.n_lists, replace=False)].copy()
+
+        for _ in range(self.n_iter):
+            labels = self._assign(sample, centroids)
+            counts = np.bincount(labels, minlength=self.n_lists)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+
+            empty = counts == 0
+            centroids[~empty] = sums[~empty] / counts[~empty, None]
+            # Re-seed empty lists from random sample points
+            if empty.any():
+                centroids[empty] = sample[rng.choice(sample_size, empty.sum(), replace=False)]
+
+        return centroids
+
+
+def metric_p(model) -> int:
+    """Minkowski exponent equivalent to a fitted KNeighborsClassifier's metric"""
+    exponents = {"euclidean": 2, "l2": 2, "manhattan": 1, "l1": 1, "cityblock": 1, "minkowski": model.p}
+    if model.metric not in exponents:
+        raise ValueError(f"ANN index does not support metric: {model.metric}")
+    return exponents[model.metric]
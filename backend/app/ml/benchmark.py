@@ -0,0 +1,98 @@
+"""
+ANN Benchmark
+Compares the IVF index against exact KNN search: recall@k, label
+agreement and per-query latency for a range of nprobe values
+
+Usage:
+    python -m app.ml.benchmark                       # trained model
+    python -m app.ml.benchmark --synthetic 1000000   # synthetic reference set
+"""
+import argparse
+import time
+import joblib
+import numpy as np
+from pathlib import Path
+from sklearn.datasets import make_blobs
+from sklearn.neighbors import KNeighborsClassifier
+from app.ml.ann import IVFIndex, metric_p
+
+
+def load_reference(model_path: str, synthetic: int, seed: int) -> KNeighborsClassifier:
+    """Trained KNN model, or one fitted on synthetic blobs of the same width"""
+    if not synthetic:
+        return joblib.load(Path(model_path) / "knn_model.pkl")
+
+    X, y = make_blobs(n_samples=synthetic, n_features=15, centers=30, random_state=seed)
+    labels = np.array(["At Risk", "Moderate", "Balanced"])[y % 3]
+    return KNeighborsClassifier(n_neighbors=5).fit(X.astype(np.float32), labels)
+
+
+def vote(model: KNeighborsClassifier, distances: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """Per-query majority vote, matching WellBeingPredictor._vote"""
+    if model.weights == "distance":
+        with np.errstate(divide="ignore"):
+            weights = 1.0 / distances
+        exact = np.isinf(weights).any(axis=1)
+        weights[exact] = np.isinf(weights[exact]).astype(float)
+    else:
+        weights = np.ones_like(distances)
+
+    neighbor_y = model._y[indices]
+    scores = np.stack(
+        [(weights * (neighbor_y == c)).sum(axis=1) for c in range(len(model.classes_))],
+        axis=1
+    )
+    return model.classes_[scores.argmax(axis=1)]
+
+
+def run(args):
+    rng = np.random.default_rng(args.seed)
+    model = load_reference(args.model_path, args.synthetic, args.seed)
+    fit_X = model._fit_X
+    k = args.k or model.n_neighbors
+
+    # Queries are perturbed reference points so they land in dense regions
+    query_ids = rng.choice(len(fit_X), min(args.queries, len(fit_X)), replace=False)
+    Q = fit_X[query_ids] + rng.normal(0, 0.1, (len(query_ids), fit_X.shape[1]))
+
+    start = time.perf_counter()
+    exact_dist, exact_idx = model.kneighbors(Q, n_neighbors=k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(Q)
+    # Vote over the same k on both sides (model.predict uses model.n_neighbors)
+    exact_labels = vote(model, exact_dist, exact_idx)
+
+    start = time.perf_counter()
+    index = IVFIndex(n_lists=args.lists or None, p=metric_p(model)).fit(fit_X)
+    build_s = time.perf_counter() - start
+
+    print(f"Reference set: {len(fit_X)} x {fit_X.shape[1]}, queries: {len(Q)}, k={k}")
+    print(f"IVF build: {build_s:.2f}s, {index.n_lists} lists")
+    print(f"Exact search: {exact_ms:.3f} ms/query")
+    print()
+    print(f"{'nprobe':>8} {'recall@k':>10} {'label agree':>12} {'ms/query':>10}")
+
+    for nprobe in args.nprobe:
+        start = time.perf_counter()
+        ann_dist, ann_idx = index.search(Q, k, nprobe=nprobe)
+        ann_ms = (time.perf_counter() - start) * 1000 / len(Q)
+
+        hits = sum(len(np.intersect1d(a, e)) for a, e in zip(ann_idx, exact_idx))
+        recall = hits / exact_idx.size
+        agreement = np.mean(vote(model, ann_dist, ann_idx) == exact_labels)
+        print(f"{nprobe:>8} {recall:>10.4f} {agreement:>12.4f} {ann_ms:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IVF index against exact KNN")
+    parser.add_argument("--model-path", default="./app/models")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic reference rows")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=0, help="Neighbors (defaults to model k)")
+    parser.add_argument("--lists", type=int, default=0, help="IVF lists (defaults to sqrt(n))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main()
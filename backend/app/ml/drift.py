@@ -0,0 +1,269 @@
+"""
+Input Drift Monitor
+Constant-memory streaming statistics of /predict inputs, compared against
+a training-set reference with PSI and KL divergence
+"""
+import math
+import joblib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from app.ml.model import (
+    GENDERS,
+    NUMERIC_FEATURES,
+    PLATFORM_MAPPING,
+    PLATFORMS,
+    WellBeingPredictor,
+    get_predictor
+)
+
+
+# (low, high, bins) per numeric feature, from the PredictionRequest bounds
+FEATURE_BINS = {
+    'age': (10, 100, 18),
+    'daily_screen_time_hrs': (0, 24, 24),
+    'sleep_quality': (1, 10, 10),
+    'stress_level': (1, 10, 10),
+    'days_without_social_media': (0, 30, 15),
+    'exercise_frequency_week': (0, 14, 14)
+}
+
+CATEGORICAL_FEATURES = {
+    'gender': ('Gender', GENDERS),
+    'primary_platform': ('Social_Media_Platform', PLATFORMS)
+}
+
+# Common rule of thumb: PSI above 0.2 means a significant shift
+PSI_THRESHOLD = 0.2
+
+# Below this many live samples PSI/KL are too noisy to report
+MIN_DRIFT_SAMPLES = 100
+
+# Where a reference distribution came from. SMOTE samples are partly
+# synthetic and class-balanced, so PSI/KL against them carry that bias.
+REFERENCE_TRAINING_ROWS = "training_rows"
+REFERENCE_SMOTE_SAMPLES = "smote_samples"
+
+# Smoothing for empty bins so PSI/KL stay finite
+EPSILON = 1e-4
+
+
+class NumericSketch:
+    """Welford mean/variance plus a fixed-bin histogram for one feature"""
+
+    __slots__ = ('low', 'high', 'bins', 'count', 'mean', 'm2', 'hist')
+
+    def __init__(self, low: float, high: float, bins: int):
+        self.low = low
+        self.high = high
+        self.bins = bins
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.hist = [0] * bins
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+    def bin_index(self, value: float) -> int:
+        index = int((value - self.low) / (self.high - self.low) * self.bins)
+        return min(max(index, 0), self.bins - 1)
+
+    def update(self, value: float):
+        """Add one observation (plain Python, no allocation)"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.hist[self.bin_index(value)] += 1
+
+    def update_many(self, values: np.ndarray):
+        """Add a batch of observations, merging moments with Chan's formula"""
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+
+        n, mean, m2 = len(values), values.mean(), ((values - values.mean()) ** 2).sum()
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+        scaled = (values - self.low) / (self.high - self.low) * self.bins
+        indices = np.clip(scaled.astype(int), 0, self.bins - 1)
+        for index, count in enumerate(np.bincount(indices, minlength=self.bins)):
+            self.hist[index] += int(count)
+
+
+class DriftMonitor:
+    """
+    Per-feature sketches for every PredictionRequest field
+
+    Memory is fixed by the bin and category counts, independent of traffic.
+    Each worker process keeps its own monitor, and update() runs without
+    awaiting inside the event loop, so no locking is needed.
+    """
+
+    def __init__(self):
+        self.numeric = {
+            name: NumericSketch(*bounds) for name, bounds in FEATURE_BINS.items()
+        }
+        self.categorical = {
+            name: dict.fromkeys(categories, 0)
+            for name, (_, categories) in CATEGORICAL_FEATURES.items()
+        }
+        # Version of the model artifacts a reference was built for
+        self.model_version = None
+        # REFERENCE_TRAINING_ROWS or REFERENCE_SMOTE_SAMPLES for references
+        self.source = None
+
+    @property
+    def count(self) -> int:
+        return self.numeric['age'].count
+
+    def update(self, input_data: Dict):
+        """Record one prediction request"""
+        for name, sketch in self.numeric.items():
+            sketch.update(input_data[name])
+
+        self.categorical['gender'][input_data['gender']] += 1
+        platform = input_data['primary_platform']
+        self.categorical['primary_platform'][PLATFORM_MAPPING.get(platform, platform)] += 1
+
+    def update_frame(self, df: pd.DataFrame):
+        """
+        Record a batch of encoded (unscaled) feature rows
+
+        Accepts the encode_features layout, so it can build the reference
+        from training chunks or from inverse-scaled model samples.
+        """
+        for name, column in NUMERIC_FEATURES.items():
+            self.numeric[name].update_many(df[column].to_numpy())
+
+        for name, (prefix, categories) in CATEGORICAL_FEATURES.items():
+            # argmax tolerates the fractional one-hots SMOTE produces
+            one_hot = df[[f'{prefix}_{category}' for category in categories]].to_numpy()
+            counts = np.bincount(one_hot.argmax(axis=1), minlength=len(categories))
+            for category, count in zip(categories, counts):
+                self.categorical[name][category] += int(count)
+
+    def distributions(self) -> Dict[str, List[int]]:
+        """Bin/category counts per feature"""
+        counts = {name: list(sketch.hist) for name, sketch in self.numeric.items()}
+        counts.update({name: list(values.values()) for name, values in self.categorical.items()})
+        return counts
+
+    def scores(self, reference: "DriftMonitor") -> Dict:
+        """
+        Drift of this monitor's traffic against a reference
+
+        PSI/KL are null and drift_detected is false until at least
+        MIN_DRIFT_SAMPLES predictions have been seen.
+
+        Returns:
+            Dictionary with per-feature PSI, KL divergence and moments
+        """
+        live = self.distributions()
+        expected = reference.distributions()
+        enough_samples = self.count >= MIN_DRIFT_SAMPLES
+        features = {}
+
+        for name in live:
+            psi, kl = _divergences(live[name], expected[name]) if enough_samples else (None, None)
+            features[name] = {"psi": psi, "kl_divergence": kl}
+
+            if name in self.numeric:
+                features[name].update({
+                    "mean": self.numeric[name].mean,
+                    "std": self.numeric[name].std,
+                    "reference_mean": reference.numeric[name].mean,
+                    "reference_std": reference.numeric[name].std
+                })
+
+        psis = [f["psi"] for f in features.values() if f["psi"] is not None]
+        max_psi = max(psis) if psis else None
+        return {
+            "samples": self.count,
+            "reference_samples": reference.count,
+            "reference_source": getattr(reference, "source", None) or "unknown",
+            "max_psi": max_psi,
+            "drift_detected": max_psi is not None and max_psi > PSI_THRESHOLD,
+            "features": features
+        }
+
+
+def _divergences(actual: List[int], expected: List[int]) -> tuple:
+    """PSI and KL(actual || expected) between two count vectors"""
+    actual_total = sum(actual) or 1
+    expected_total = sum(expected) or 1
+    psi = kl = 0.0
+
+    for a, e in zip(actual, expected):
+        p = max(a / actual_total, EPSILON)
+        q = max(e / expected_total, EPSILON)
+        log_ratio = math.log(p / q)
+        psi += (p - q) * log_ratio
+        kl += p * log_ratio
+
+    return psi, kl
+
+
+def load_reference(predictor: WellBeingPredictor) -> DriftMonitor:
+    """
+    Load the training-set reference saved with the model artifacts
+
+    Models retrained with app.ml.retrain ship drift_reference.pkl. For
+    older models, or when the saved reference was built for different
+    artifacts (model_version mismatch), it is rebuilt from the
+    (SMOTE-balanced) training samples held by the KNN model and saved,
+    with source REFERENCE_SMOTE_SAMPLES so the bias is reported.
+    """
+    reference_file = predictor.model_path / "drift_reference.pkl"
+    if reference_file.exists():
+        reference = joblib.load(reference_file)
+        if getattr(reference, "model_version", None) == predictor.model_version:
+            return reference
+        print("⚠️ Drift reference does not match model, rebuilding")
+
+    samples = pd.DataFrame(
+        predictor.scaler.inverse_transform(predictor.model._fit_X),
+        columns=predictor.feature_columns
+    )
+    reference = DriftMonitor()
+    reference.update_frame(samples)
+    reference.model_version = predictor.model_version
+    reference.source = REFERENCE_SMOTE_SAMPLES
+    print("⚠️ Drift reference built from SMOTE-balanced model samples")
+    try:
+        joblib.dump(reference, reference_file)
+    except OSError as e:
+        print(f"⚠️ Could not persist drift reference: {e}")
+    return reference
+
+
+# Global instances (one per worker process)
+drift_monitor: Optional[DriftMonitor] = None
+drift_reference: Optional[DriftMonitor] = None
+
+
+def get_drift_monitor() -> DriftMonitor:
+    """Get or create the drift monitor for this process"""
+    global drift_monitor
+    if drift_monitor is None:
+        drift_monitor = DriftMonitor()
+    return drift_monitor
+
+
+def get_drift_reference() -> DriftMonitor:
+    """
+    Get or load the training-set reference for the current model
+
+    Called at application startup so the first /monitoring/drift
+    request never has to build or write the reference.
+    """
+    global drift_reference
+    if drift_reference is None:
+        drift_reference = load_reference(get_predictor())
+    return drift_reference
@@ -2,21 +2,111 @@
 ML Model Handler
 Loads trained KNN model and handles predictions
 """
+import os
+import hashlib
 import joblib
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+from app.ml.ann import IVFIndex, metric_p
+
+
+# Neighbor search backend: "exact" (sklearn brute force/tree) or "ivf"
+NEIGHBOR_INDEX = os.getenv("NEIGHBOR_INDEX", "exact")
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+IVF_LISTS = int(os.getenv("IVF_LISTS", "0")) or None
+
+NUMERIC_FEATURES = {
+    'age': 'Age',
+    'daily_screen_time_hrs': 'Daily_Screen_Time(hrs)',
+    'sleep_quality': 'Sleep_Quality(1-10)',
+    'stress_level': 'Stress_Level(1-10)',
+    'days_without_social_media': 'Days_Without_Social_Media',
+    'exercise_frequency_week': 'Exercise_Frequency(week)'
+}
+
+GENDERS = ['Female', 'Male', 'Other']
+
+# Map user-friendly names to exact CSV column values
+PLATFORM_MAPPING = {
+    'Facebook': 'Facebook',
+    'Instagram': 'Instagram',
+    'LinkedIn': 'LinkedIn',
+    'TikTok': 'TikTok',
+    'X': 'X (Twitter)',  # CSV has "X (Twitter)" not just "X"
+    'YouTube': 'YouTube'
+}
+
+PLATFORMS = ['Facebook', 'Instagram', 'LinkedIn', 'TikTok', 'X (Twitter)', 'YouTube']
+
+# Well-being categories the API understands (confidence, recommendations)
+CLASSES = ["At Risk", "Moderate", "Balanced"]
+
+# Column order produced by encode_features (matches the training CSV pipeline)
+FEATURE_COLUMNS = (
+    list(NUMERIC_FEATURES.values())
+    + [f'Gender_{gender}' for gender in GENDERS]
+    + [f'Social_Media_Platform_{platform}' for platform in PLATFORMS]
+)
+
+
+def encode_features(records: List[Dict]) -> pd.DataFrame:
+    """
+    Encode raw user inputs into engineered features
+    
+    Shared by prediction and retraining so both see identical columns.
+    
+    Args:
+        records: List of dictionaries with user inputs
+        
+    Returns:
+        DataFrame with columns in FEATURE_COLUMNS order
+    """
+    raw = pd.DataFrame.from_records(records)
+    
+    # Base numeric features
+    data = {column: raw[key] for key, column in NUMERIC_FEATURES.items()}
+    
+    # One-hot encode Gender (matches pd.get_dummies with columns=['Gender'])
+    for gender in GENDERS:
+        data[f'Gender_{gender}'] = (raw['gender'] == gender).astype(int)
+    
+    # One-hot encode Social_Media_Platform (matches pd.get_dummies with columns=['Social_Media_Platform'])
+    mapped_platform = raw['primary_platform'].map(lambda p: PLATFORM_MAPPING.get(p, p))
+    for platform in PLATFORMS:
+        data[f'Social_Media_Platform_{platform}'] = (mapped_platform == platform).astype(int)
+    
+    return pd.DataFrame(data)
+
+
+def artifact_hash(model_path: Path) -> str:
+    """
+    Content hash of the model artifacts, used as the model version
+    
+    Derived files (ANN index, drift reference) record it so they can
+    tell when the model they were built for has been replaced.
+    """
+    digest = hashlib.sha256()
+    for name in ["knn_model.pkl", "scaler.pkl", "feature_columns.pkl"]:
+        with open(Path(model_path) / name, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()[:16]
 
 
 class WellBeingPredictor:
     """Handles loading and predictions for the Digital Well-Being KNN model"""
     
-    def __init__(self, model_path: str = "./app/models"):
+    def __init__(self, model_path: str = "./app/models", index_type: Optional[str] = None):
         self.model_path = Path(model_path)
+        self.index_type = index_type or NEIGHBOR_INDEX
         self.model = None
         self.scaler = None
         self.feature_columns = None
+        self.metadata = {}
+        self.model_version = None
+        self.ann_index: Optional[IVFIndex] = None
         self.load_models()
     
     def load_models(self):
@@ -25,11 +115,76 @@ class WellBeingPredictor:
             self.model = joblib.load(self.model_path / "knn_model.pkl")
             self.scaler = joblib.load(self.model_path / "scaler.pkl")
             self.feature_columns = joblib.load(self.model_path / "feature_columns.pkl")
+            # Written by app.ml.retrain; absent for the original CSV-trained model
+            metadata_file = self.model_path / "model_metadata.pkl"
+            if metadata_file.exists():
+                self.metadata = joblib.load(metadata_file)
+            self.model_version = artifact_hash(self.model_path)
             print(f"✅ Models loaded successfully from {self.model_path}")
             print(f"📊 Features: {len(self.feature_columns)}")
         except Exception as e:
             print(f"❌ Error loading models: {e}")
             raise
+
+        if self.index_type == "ivf":
+            self.ann_index = self.load_ann_index()
+        elif self.index_type != "exact":
+            raise ValueError(f"Unknown neighbor index type: {self.index_type}")
+
+    def load_ann_index(self) -> IVFIndex:
+        """
+        Load the persisted IVF index, rebuilding it if missing or stale
+
+        The index is saved next to the model artifacts as ann_index.pkl
+        so it only has to be trained once per model. It records the
+        model_version, metric and IVF_LISTS it was built with and is
+        rebuilt if any of them changed.
+        """
+        index_file = self.model_path / "ann_index.pkl"
+        p = metric_p(self.model)
+
+        if index_file.exists():
+            index = joblib.load(index_file)
+            if (
+                getattr(index, "model_version", None) == self.model_version
+                and index.p == p
+                and getattr(index, "requested_lists", None) == IVF_LISTS
+            ):
+                index.attach(self.model._fit_X)
+                index.nprobe = IVF_NPROBE
+                print(f"⚡ ANN index loaded ({index.n_lists} lists, nprobe={index.nprobe})")
+                return index
+            print("⚠️ ANN index does not match model, rebuilding")
+
+        index = IVFIndex(n_lists=IVF_LISTS, nprobe=IVF_NPROBE, p=p).fit(self.model._fit_X)
+        index.model_version = self.model_version
+        try:
+            joblib.dump(index, index_file)
+        except OSError as e:
+            print(f"⚠️ Could not persist ANN index: {e}")
+        print(f"⚡ ANN index built ({index.n_lists} lists, nprobe={index.nprobe})")
+        return index
+
+    def kneighbors(self, X_scaled: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest neighbors from the configured index (exact or approximate)"""
+        if self.ann_index is not None:
+            return self.ann_index.search(X_scaled, self.model.n_neighbors)
+        return self.model.kneighbors(X_scaled)
+
+    def _vote(self, distances: np.ndarray, neighbor_labels: np.ndarray) -> str:
+        """Majority vote over neighbor labels, honoring the model's weights"""
+        if self.model.weights == "distance":
+            with np.errstate(divide="ignore"):
+                weights = 1.0 / distances
+            # Exact matches dominate, as in sklearn
+            if np.isinf(weights).any():
+                weights = np.isinf(weights).astype(float)
+        else:
+            weights = np.ones_like(distances, dtype=float)
+
+        classes = list(self.model.classes_)
+        scores = [weights[neighbor_labels == c].sum() for c in classes]
+        return classes[int(np.argmax(scores))]
     
     def preprocess_input(self, input_data: Dict) -> pd.DataFrame:
         """
@@ -41,40 +196,7 @@ class WellBeingPredictor:
         Returns:
             DataFrame with engineered features matching training
         """
-        # Create base dataframe with numeric features
-        data = {
-            'Age': [input_data['age']],
-            'Daily_Screen_Time(hrs)': [input_data['daily_screen_time_hrs']],
-            'Sleep_Quality(1-10)': [input_data['sleep_quality']],
-            'Stress_Level(1-10)': [input_data['stress_level']],
-            'Days_Without_Social_Media': [input_data['days_without_social_media']],
-            'Exercise_Frequency(week)': [input_data['exercise_frequency_week']]
-        }
-        
-        # One-hot encode Gender (matches pd.get_dummies with columns=['Gender'])
-        genders = ['Female', 'Male', 'Other']
-        for gender in genders:
-            data[f'Gender_{gender}'] = [1 if input_data['gender'] == gender else 0]
-        
-        # One-hot encode Social_Media_Platform (matches pd.get_dummies with columns=['Social_Media_Platform'])
-        # Map user-friendly names to exact CSV column values
-        platform_mapping = {
-            'Facebook': 'Facebook',
-            'Instagram': 'Instagram',
-            'LinkedIn': 'LinkedIn',
-            'TikTok': 'TikTok',
-            'X': 'X (Twitter)',  # CSV has "X (Twitter)" not just "X"
-            'YouTube': 'YouTube'
-        }
-        
-        platforms = ['Facebook', 'Instagram', 'LinkedIn', 'TikTok', 'X (Twitter)', 'YouTube']
-        user_platform = input_data['primary_platform']
-        mapped_platform = platform_mapping.get(user_platform, user_platform)
-        
-        for platform in platforms:
-            data[f'Social_Media_Platform_{platform}'] = [1 if mapped_platform == platform else 0]
-        
-        df = pd.DataFrame(data)
+        df = encode_features([input_data])
         
         # Ensure column order matches training (uses feature_columns.pkl)
         df = df[self.feature_columns]
@@ -97,12 +219,9 @@ class WellBeingPredictor:
         # Scale features
         X_scaled = self.scaler.transform(X)
         
-        # Get prediction (model was trained with string labels)
-        prediction_label = self.model.predict(X_scaled)[0]
-        
         # Get confidence (probability estimates)
         # KNN doesn't have predict_proba, so we use distance-based confidence
-        distances, indices = self.model.kneighbors(X_scaled)
+        distances, indices = self.kneighbors(X_scaled)
         
         # Get labels of k nearest neighbors (these are numeric indices)
         neighbor_indices = self.model._y[indices[0]]
@@ -117,8 +236,14 @@ class WellBeingPredictor:
         # Map numeric indices to string labels
         neighbor_labels = classes[neighbor_indices]
         
+        # Get prediction (model was trained with string labels)
+        if self.ann_index is not None:
+            prediction_label = self._vote(distances[0], neighbor_labels)
+        else:
+            prediction_label = self.model.predict(X_scaled)[0]
+        
         # Get unique classes
-        unique_classes = ["At Risk", "Moderate", "Balanced"]
+        unique_classes = CLASSES
         
         # Calculate confidence as percentage of each class in neighbors
         confidence = {}
@@ -222,10 +347,10 @@ class WellBeingPredictor:
             "n_neighbors": self.model.n_neighbors if hasattr(self.model, 'n_neighbors') else 5,
             "features": len(self.feature_columns),
             "feature_names": self.feature_columns,
-            "classes": ["At Risk", "Moderate", "Balanced"],
-            "balanced_with_smote": True,
-            "accuracy": 0.68,  # From training
-            "training_samples": 867  # After SMOTE
+            "classes": CLASSES,
+            "balanced_with_smote": self.metadata.get("balanced_with_smote", True),
+            "accuracy": self.metadata.get("accuracy", 0.68),  # From training
+            "training_samples": self.metadata.get("training_samples", 867)  # After SMOTE
         }
 
 
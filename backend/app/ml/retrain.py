@@ -0,0 +1,264 @@
+"""
+Retraining Pipeline
+Rebuilds the KNN model artifacts from the assessments table
+
+Rows are streamed from the database in chunks, encoded exactly like
+prediction inputs and used to fit the scaler incrementally. The k /
+weights / metric search runs SMOTE + KNN for every (params, fold) pair
+across a process pool, so wall time scales with available cores.
+
+Usage:
+    python -m app.ml.retrain
+    python -m app.ml.retrain --output ./app/models --workers 8 --folds 5
+"""
+import argparse
+import itertools
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from imblearn.over_sampling import SMOTE
+from sklearn.model_selection import StratifiedKFold
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import StandardScaler
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.database import SQLALCHEMY_DATABASE_URL
+from app.ml.drift import REFERENCE_TRAINING_ROWS, DriftMonitor
+from app.ml.model import (
+    CLASSES,
+    FEATURE_COLUMNS,
+    GENDERS,
+    NUMERIC_FEATURES,
+    PLATFORM_MAPPING,
+    artifact_hash,
+    encode_features
+)
+from app.models.database_models import Assessment
+
+
+INPUT_COLUMNS = list(NUMERIC_FEATURES) + ["gender", "primary_platform"]
+
+PARAM_GRID = {
+    "n_neighbors": [3, 5, 7, 9, 11, 15],
+    "weights": ["uniform", "distance"],
+    "metric": ["euclidean", "manhattan"]
+}
+
+RANDOM_STATE = 42
+
+# Training data shared with pool workers, set once per process by _init_worker
+_X = None
+_y = None
+
+
+def stream_chunks(database_url: str, chunk_size: int) -> Iterator[Tuple[pd.DataFrame, np.ndarray]]:
+    """
+    Yield (features, labels) chunks from the assessments table
+
+    Uses a server-side cursor (yield_per) so memory is bounded by
+    chunk_size rather than the table size. /history/save does not
+    validate its input, so rows with NULLs are filtered in SQL and rows
+    with non-numeric values, unknown categories or a prediction outside
+    CLASSES are dropped per chunk.
+    """
+    engine = create_engine(database_url)
+    columns = [getattr(Assessment, name) for name in INPUT_COLUMNS]
+    query = (
+        select(*columns, Assessment.prediction)
+        .where(Assessment.prediction.is_not(None), *[column.is_not(None) for column in columns])
+        .order_by(Assessment.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    with Session(engine) as db:
+        for partition in db.execute(query).partitions():
+            raw = pd.DataFrame.from_records(partition, columns=INPUT_COLUMNS + ["prediction"])
+            numeric = raw[list(NUMERIC_FEATURES)].apply(pd.to_numeric, errors="coerce")
+            raw[list(NUMERIC_FEATURES)] = numeric
+            valid = (
+                numeric.notna().all(axis=1)
+                & raw["gender"].isin(GENDERS)
+                & raw["primary_platform"].isin(list(PLATFORM_MAPPING))
+                & raw["prediction"].isin(CLASSES)
+            )
+            if not valid.all():
+                print(f"⚠️ Skipped {(~valid).sum()} invalid rows")
+            if not valid.any():
+                continue
+
+            raw = raw[valid]
+            features = encode_features(raw[INPUT_COLUMNS].to_dict("records"))[FEATURE_COLUMNS]
+            yield features, raw["prediction"].to_numpy()
+
+
+def load_training_data(
+    database_url: str,
+    chunk_size: int
+) -> Tuple[np.ndarray, np.ndarray, StandardScaler, DriftMonitor]:
+    """
+    Stream all labeled rows, fitting the scaler with partial_fit per chunk
+
+    The drift reference is accumulated from the same unscaled chunks.
+    """
+    scaler = StandardScaler()
+    reference = DriftMonitor()
+    reference.source = REFERENCE_TRAINING_ROWS
+    X_chunks, y_chunks = [], []
+
+    for X, y in stream_chunks(database_url, chunk_size):
+        scaler.partial_fit(X)
+        reference.update_frame(X)
+        X_chunks.append(X)
+        y_chunks.append(y)
+        print(f"📥 Loaded {sum(len(c) for c in y_chunks)} rows")
+
+    if not X_chunks:
+        raise ValueError("No labeled assessments found to train on")
+
+    X = scaler.transform(pd.concat(X_chunks, ignore_index=True)).astype(np.float32)
+    y = np.concatenate(y_chunks)
+    return X, y, scaler, reference
+
+
+def balance(X: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """SMOTE oversampling, with k_neighbors capped for tiny minority classes"""
+    _, counts = np.unique(y, return_counts=True)
+    k_neighbors = min(5, counts.min() - 1)
+    if k_neighbors < 1:
+        return X, y
+    smote = SMOTE(k_neighbors=k_neighbors, random_state=RANDOM_STATE)
+    return smote.fit_resample(X, y)
+
+
+def _init_worker(X: np.ndarray, y: np.ndarray):
+    """Receive the training data once per worker instead of once per task"""
+    global _X, _y
+    _X, _y = X, y
+
+
+def _evaluate(task: Tuple[Dict, np.ndarray, np.ndarray]) -> Tuple[Dict, float]:
+    """Fit SMOTE + KNN on one training fold and score the held-out fold"""
+    params, train_idx, val_idx = task
+    X_train, y_train = balance(_X[train_idx], _y[train_idx])
+    model = KNeighborsClassifier(**params).fit(X_train, y_train)
+    return params, model.score(_X[val_idx], _y[val_idx])
+
+
+def search(X: np.ndarray, y: np.ndarray, folds: int, workers: int) -> Tuple[Dict, float]:
+    """
+    Cross-validated grid search over PARAM_GRID in a process pool
+
+    SMOTE is applied inside each training fold only, so synthetic
+    samples never leak into the validation fold.
+
+    Returns:
+        Tuple of (best_params, mean_accuracy)
+    """
+    splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=RANDOM_STATE)
+    splits = list(splitter.split(X, y))
+    grid: List[Dict] = [
+        dict(zip(PARAM_GRID, values)) for values in itertools.product(*PARAM_GRID.values())
+    ]
+    tasks = [(params, train_idx, val_idx) for params in grid for train_idx, val_idx in splits]
+
+    scores: Dict[Tuple, List[float]] = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X, y)) as pool:
+        for params, score in pool.map(_evaluate, tasks, chunksize=max(1, len(tasks) // (workers * 4))):
+            scores.setdefault(tuple(params.items()), []).append(score)
+
+    best_key = max(scores, key=lambda key: np.mean(scores[key]))
+    return dict(best_key), float(np.mean(scores[best_key]))
+
+
+def export(
+    output: Path,
+    model: KNeighborsClassifier,
+    scaler: StandardScaler,
+    reference: DriftMonitor,
+    metadata: Dict
+):
+    """
+    Write artifacts in the layout WellBeingPredictor.load_models expects
+
+    Everything is written to a staging directory first and only moved
+    into place (os.replace, one rename per file) once all dumps succeed,
+    so a crash mid-export never leaves a half-written model/scaler pair.
+    The output directory itself is not swapped since app/models also
+    holds source files.
+    """
+    output.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=".retrain-", dir=output))
+    try:
+        joblib.dump(model, staging / "knn_model.pkl")
+        joblib.dump(scaler, staging / "scaler.pkl")
+        joblib.dump(FEATURE_COLUMNS, staging / "feature_columns.pkl")
+        joblib.dump(metadata, staging / "model_metadata.pkl")
+        reference.model_version = artifact_hash(staging)
+        joblib.dump(reference, staging / "drift_reference.pkl")
+
+        for artifact in staging.iterdir():
+            os.replace(artifact, output / artifact.name)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    # Any ANN index was built for the previous model
+    stale_index = output / "ann_index.pkl"
+    if stale_index.exists():
+        stale_index.unlink()
+
+
+def retrain(database_url: str, output: Path, chunk_size: int, folds: int, workers: int) -> Dict:
+    """Run the full pipeline and return the exported metadata"""
+    start = time.perf_counter()
+    X, y, scaler, reference = load_training_data(database_url, chunk_size)
+
+    classes, counts = np.unique(y, return_counts=True)
+    if len(classes) < 2:
+        raise ValueError(f"Need at least 2 classes to train, found {list(classes)}")
+    folds = min(folds, counts.min())
+    if folds < 2:
+        raise ValueError("Every class needs at least 2 rows for cross-validation")
+
+    print(f"🔍 Searching {np.prod([len(v) for v in PARAM_GRID.values()])} configs x {folds} folds on {workers} workers")
+    best_params, cv_accuracy = search(X, y, folds, workers)
+    print(f"🏆 Best params: {best_params} (CV accuracy {cv_accuracy:.4f})")
+
+    X_balanced, y_balanced = balance(X, y)
+    model = KNeighborsClassifier(**best_params).fit(X_balanced, y_balanced)
+
+    metadata = {
+        "accuracy": round(cv_accuracy, 4),
+        "training_samples": int(len(y_balanced)),
+        "balanced_with_smote": len(y_balanced) > len(y),
+        "params": best_params,
+        "trained_at": datetime.utcnow().isoformat()
+    }
+    export(output, model, scaler, reference, metadata)
+    print(f"✅ Exported artifacts to {output} in {time.perf_counter() - start:.1f}s")
+    return metadata
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain the KNN model from stored assessments")
+    parser.add_argument("--database-url", default=SQLALCHEMY_DATABASE_URL)
+    parser.add_argument("--output", default="./app/models")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    retrain(args.database_url, Path(args.output), args.chunk_size, args.folds, args.workers)
+
+
+if __name__ == "__main__":
+    main()
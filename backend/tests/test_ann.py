@@ -0,0 +1,58 @@
+"""
+Tests for the IVF approximate neighbor index
+"""
+import joblib
+import numpy as np
+import pytest
+from sklearn.neighbors import NearestNeighbors
+from app.ml.ann import IVFIndex
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    return rng.normal(size=(2000, 15)).astype(np.float32), rng.normal(size=(50, 15)).astype(np.float32)
+
+
+@pytest.mark.parametrize("p", [1, 2])
+def test_full_probe_matches_exact(data, p):
+    X, Q = data
+    index = IVFIndex(n_lists=20, p=p).fit(X)
+    distances, indices = index.search(Q, k=5, nprobe=index.n_lists)
+
+    exact_distances, exact_indices = NearestNeighbors(n_neighbors=5, p=p).fit(X).kneighbors(Q)
+    np.testing.assert_array_equal(indices, exact_indices)
+    np.testing.assert_allclose(distances, exact_distances, rtol=1e-5)
+
+
+def test_search_returns_k_when_probed_lists_are_small(data):
+    X, Q = data
+    index = IVFIndex(n_lists=500).fit(X)
+    distances, indices = index.search(Q, k=15, nprobe=1)
+
+    assert indices.shape == (len(Q), 15)
+    assert (np.diff(distances, axis=1) >= 0).all()
+    assert all(len(set(row)) == 15 for row in indices)
+
+
+def test_every_point_indexed_once(data):
+    X, _ = data
+    index = IVFIndex().fit(X)
+
+    assert index.n_lists == int(np.sqrt(len(X)))
+    assert sorted(index.ids) == list(range(len(X)))
+    assert index.offsets[-1] == len(X)
+
+
+def test_pickle_excludes_reference_points(data, tmp_path):
+    X, Q = data
+    index = IVFIndex(n_lists=20).fit(X)
+    joblib.dump(index, tmp_path / "index.pkl")
+
+    loaded = joblib.load(tmp_path / "index.pkl")
+    assert loaded.data is None
+    with pytest.raises(ValueError):
+        loaded.search(Q, k=5)
+
+    loaded.attach(X)
+    np.testing.assert_array_equal(loaded.search(Q, k=5)[1], index.search(Q, k=5)[1])
@@ -0,0 +1,72 @@
+"""
+Tests for the streaming drift monitor
+"""
+import numpy as np
+from app.ml.drift import MIN_DRIFT_SAMPLES, DriftMonitor, NumericSketch, load_reference
+from app.ml.model import WellBeingPredictor
+from tests.test_predictor import write_artifacts
+
+REQUEST = {
+    "age": 25,
+    "gender": "Female",
+    "daily_screen_time_hrs": 6.5,
+    "primary_platform": "X",
+    "sleep_quality": 7,
+    "stress_level": 6,
+    "days_without_social_media": 2,
+    "exercise_frequency_week": 3
+}
+
+
+def test_welford_and_chan_merge_match_numpy():
+    values = np.random.default_rng(0).uniform(0, 24, 1000)
+    streamed = NumericSketch(0, 24, 24)
+    for value in values:
+        streamed.update(value)
+
+    merged = NumericSketch(0, 24, 24)
+    for chunk in np.array_split(values, 7):
+        merged.update_many(chunk)
+
+    for sketch in (streamed, merged):
+        assert sketch.count == len(values)
+        assert np.isclose(sketch.mean, values.mean())
+        assert np.isclose(sketch.std, values.std())
+    assert streamed.hist == merged.hist
+
+
+def test_histogram_clamps_to_bounds():
+    sketch = NumericSketch(1, 10, 10)
+    for value in [1, 10, -5, 50]:
+        sketch.update(value)
+    assert sketch.hist[0] == 2
+    assert sketch.hist[-1] == 2
+
+
+def test_no_drift_reported_below_min_samples():
+    reference = DriftMonitor()
+    monitor = DriftMonitor()
+    monitor.update(REQUEST)
+
+    scores = monitor.scores(reference)
+    assert scores["max_psi"] is None
+    assert scores["drift_detected"] is False
+
+    for _ in range(MIN_DRIFT_SAMPLES):
+        monitor.update(REQUEST)
+        reference.update({**REQUEST, "age": 70, "primary_platform": "YouTube"})
+
+    scores = monitor.scores(reference)
+    assert scores["drift_detected"] is True
+    assert scores["features"]["gender"]["psi"] < 1e-9
+
+
+def test_reference_from_model_samples_is_labelled(tmp_path):
+    write_artifacts(tmp_path, seed=0, n_neighbors=5)
+    predictor = WellBeingPredictor(str(tmp_path))
+
+    reference = load_reference(predictor)
+    assert reference.source == "smote_samples"
+    assert reference.model_version == predictor.model_version
+    assert (tmp_path / "drift_reference.pkl").exists()
+    assert DriftMonitor().scores(reference)["reference_source"] == "smote_samples"
@@ -0,0 +1,214 @@
+"""
+Tests for the per-user history cache
+"""
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.api import history, responses
+from app.api.history import HistoryCache, LRUCache
+from app.database import Base, get_db
+
+
+class DictBackend(dict):
+    """Local stand-in for a shared backend such as redis"""
+
+    def set(self, key, value, ex=None):
+        self[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.pop(key, None)
+
+
+INPUT_DATA = {
+    "age": 25,
+    "gender": "Female",
+    "daily_screen_time_hrs": 6.5,
+    "primary_platform": "Instagram",
+    "sleep_quality": 7,
+    "stress_level": 6,
+    "days_without_social_media": 2,
+    "exercise_frequency_week": 3
+}
+
+
+def save_payload(prediction: str) -> dict:
+    return {
+        "input_data": INPUT_DATA,
+        "prediction": {
+            "prediction": prediction,
+            "confidence": {"At Risk": 10.0, "Moderate": 30.0, "Balanced": 60.0}
+        }
+    }
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = DictBackend()
+    monkeypatch.setattr(history, "history_cache", HistoryCache(backend=backend))
+    return backend
+
+
+@pytest.fixture
+def client(backend):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    TestingSession = sessionmaker(bind=engine)
+
+    def override_get_db():
+        db = TestingSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(history.router)
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app)
+
+
+def test_repeat_reads_hit_cache(client):
+    client.post("/api/v1/history/save?user_id=u1", json=save_payload("Moderate"))
+
+    for _ in range(3):
+        assert client.get("/api/v1/history/user/u1").json()["count"] == 1
+        assert client.get("/api/v1/history/stats/u1").json()["stats"]["total_assessments"] == 1
+
+    stats = history.history_cache.stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 4
+
+
+def test_save_invalidates(client):
+    client.post("/api/v1/history/save?user_id=u1", json=save_payload("Moderate"))
+    assert client.get("/api/v1/history/user/u1").json()["count"] == 1
+    assert client.get("/api/v1/history/stats/u1").json()["stats"]["trend"] == "insufficient_data"
+
+    client.post("/api/v1/history/save?user_id=u1", json=save_payload("Balanced"))
+    assert client.get("/api/v1/history/user/u1").json()["count"] == 2
+    assert client.get("/api/v1/history/stats/u1").json()["stats"]["trend"] == "improving"
+
+
+def test_delete_invalidates(client, backend):
+    client.post("/api/v1/history/save?user_id=u1", json=save_payload("Moderate"))
+    client.get("/api/v1/history/user/u1")
+    client.delete("/api/v1/history/user/u1")
+
+    assert client.get("/api/v1/history/user/u1").json()["count"] == 0
+    assert client.get("/api/v1/history/stats/u1").json()["stats"] is None
+
+
+def test_hits_are_not_recompressed(client, monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+    for _ in range(5):
+        client.post("/api/v1/history/save?user_id=u1", json=save_payload("Moderate"))
+
+    calls = []
+    real_compress = gzip.compress
+    monkeypatch.setattr(responses.gzip, "compress", lambda *a, **kw: calls.append(1) or real_compress(*a, **kw))
+
+    for _ in range(3):
+        response = client.get("/api/v1/history/user/u1", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.json()["count"] == 5
+    assert len(calls) == 1
+
+
+def test_entries_are_per_encoding(client, monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+    for _ in range(5):
+        client.post("/api/v1/history/save?user_id=u1", json=save_payload("Moderate"))
+
+    gzipped = client.get("/api/v1/history/user/u1", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/api/v1/history/user/u1", headers={"Accept-Encoding": "identity"})
+    small = client.get("/api/v1/history/stats/u1", headers={"Accept-Encoding": "gzip"})
+
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in plain.headers
+    assert gzipped.json() == plain.json()
+    # Below MIN_COMPRESS_SIZE the cached entry records that it is not compressed
+    assert "content-encoding" not in small.headers
+    assert "content-encoding" not in client.get("/api/v1/history/stats/u1", headers={"Accept-Encoding": "gzip"}).headers
+    assert history.history_cache.stats()["misses"] == 3
+
+
+def test_invalidate_clears_every_encoding(backend):
+    cache = HistoryCache(backend=backend)
+    generation = cache.generation("u1")
+    for encoding in responses.ENCODINGS:
+        cache.set("stats", "u1", generation, encoding, b"body", encoding)
+
+    cache.invalidate("u1")
+
+    assert list(backend) == [cache.generation_key("u1")]
+
+
+def test_invalidate_only_affects_user(backend):
+    cache = HistoryCache(backend=backend)
+    cache.set("stats", "u1", cache.generation("u1"), "gzip", b"one", "identity")
+    cache.set("stats", "u2", cache.generation("u2"), "gzip", b"two", "identity")
+
+    cache.invalidate("u1")
+
+    assert cache.get("stats", "u1", cache.generation("u1"), "gzip") is None
+    assert cache.get("stats", "u2", cache.generation("u2"), "gzip") == (b"two", "identity")
+
+
+def test_write_after_invalidate_is_not_served(backend):
+    cache = HistoryCache(backend=backend)
+    generation = cache.generation("u1")  # Reader starts before a concurrent save
+    cache.invalidate("u1")
+    cache.set("stats", "u1", generation, "identity", b"stale", "identity")
+
+    assert cache.get("stats", "u1", cache.generation("u1"), "identity") is None
+
+
+def test_lru_evicts_at_max_bytes():
+    cache = LRUCache(max_bytes=100)
+    for key in "abcd":
+        cache.set(key, b"x" * 30)
+
+    assert cache.get("a") is None
+    assert cache.size == 90
+    assert cache.evictions == 1
+
+    cache.get("b")  # b becomes most recently used
+    cache.set("e", b"y" * 30)
+    assert cache.get("c") is None
+    assert cache.get("b") is not None
+    assert cache.size == 90
+
+
+def test_lru_byte_accounting():
+    cache = LRUCache(max_bytes=100)
+    cache.set("a", b"x" * 40)
+    cache.set("a", b"x" * 10)
+    assert cache.size == 10
+
+    cache.delete("a", "missing")
+    assert cache.size == 0
+
+    cache.set("big", b"x" * 101)
+    assert cache.get("big") is None
+    assert cache.size == 0
+
+
+def test_lru_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(history.time, "monotonic", lambda: now[0])
+    cache = LRUCache(max_bytes=100)
+    cache.set("a", b"x" * 10, ex=60)
+
+    assert cache.get("a") == b"x" * 10
+    now[0] += 61
+    assert cache.get("a") is None
+    assert cache.size == 0
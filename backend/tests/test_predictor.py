@@ -0,0 +1,82 @@
+"""
+Tests for the predictor's IVF neighbor search path
+"""
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import StandardScaler
+from app.ml import model as model_module
+from app.ml.model import FEATURE_COLUMNS, GENDERS, PLATFORM_MAPPING, WellBeingPredictor
+
+CLASSES = ["At Risk", "Moderate", "Balanced"]
+
+
+def write_artifacts(path, seed: int, **knn_params):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.random((600, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    y = rng.choice(CLASSES, len(X))
+    scaler = StandardScaler().fit(X)
+    knn = KNeighborsClassifier(**knn_params).fit(scaler.transform(X), y)
+    joblib.dump(knn, path / "knn_model.pkl")
+    joblib.dump(scaler, path / "scaler.pkl")
+    joblib.dump(FEATURE_COLUMNS, path / "feature_columns.pkl")
+
+
+def random_inputs(n: int):
+    rng = np.random.default_rng(1)
+    for _ in range(n):
+        yield {
+            "age": int(rng.integers(10, 100)),
+            "gender": str(rng.choice(GENDERS)),
+            "daily_screen_time_hrs": float(rng.uniform(0, 24)),
+            "primary_platform": str(rng.choice(list(PLATFORM_MAPPING))),
+            "sleep_quality": int(rng.integers(1, 11)),
+            "stress_level": int(rng.integers(1, 11)),
+            "days_without_social_media": int(rng.integers(0, 31)),
+            "exercise_frequency_week": int(rng.integers(0, 15))
+        }
+
+
+@pytest.fixture(autouse=True)
+def full_probe(monkeypatch):
+    # Scan every list so the IVF path must match exact search
+    monkeypatch.setattr(model_module, "IVF_NPROBE", 10_000)
+
+
+@pytest.mark.parametrize("knn_params", [
+    {"n_neighbors": 7},
+    {"n_neighbors": 9, "weights": "distance", "metric": "manhattan"}
+])
+def test_ivf_predictions_match_exact(tmp_path, knn_params):
+    write_artifacts(tmp_path, seed=0, **knn_params)
+    exact = WellBeingPredictor(str(tmp_path))
+    ivf = WellBeingPredictor(str(tmp_path), index_type="ivf")
+
+    for input_data in random_inputs(50):
+        assert ivf.predict(input_data)[:2] == exact.predict(input_data)[:2]
+
+
+def test_stale_index_is_rebuilt(tmp_path):
+    write_artifacts(tmp_path, seed=0, n_neighbors=5)
+    first = WellBeingPredictor(str(tmp_path), index_type="ivf")
+
+    # Same shape, different data
+    write_artifacts(tmp_path, seed=1, n_neighbors=5)
+    second = WellBeingPredictor(str(tmp_path), index_type="ivf")
+
+    assert second.model_version != first.model_version
+    assert second.ann_index.model_version == second.model_version
+
+    X = second.scaler.transform(second.preprocess_input(next(random_inputs(1))))
+    np.testing.assert_array_equal(second.kneighbors(X)[1], second.model.kneighbors(X)[1])
+
+
+def test_index_rebuilt_when_list_count_changes(tmp_path, monkeypatch):
+    write_artifacts(tmp_path, seed=0, n_neighbors=5)
+    WellBeingPredictor(str(tmp_path), index_type="ivf")
+
+    monkeypatch.setattr(model_module, "IVF_LISTS", 4)
+    predictor = WellBeingPredictor(str(tmp_path), index_type="ivf")
+    assert predictor.ann_index.n_lists == 4
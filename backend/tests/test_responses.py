@@ -0,0 +1,62 @@
+"""
+Tests for ETag and compression response helpers
+"""
+import gzip
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from app.api import responses
+from app.api.responses import compressed_response, dumps, etag_response
+
+ETAG = '"model-info-abc123"'
+BODY = dumps({"algorithm": "K-Nearest Neighbors"})
+LARGE = {"assessments": [{"id": i, "prediction": "Moderate"} for i in range(200)]}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/static")
+    async def static(request: Request):
+        return etag_response(request, BODY, ETAG)
+
+    @app.get("/large")
+    async def large(request: Request):
+        return compressed_response(request, LARGE)
+
+    return TestClient(app)
+
+
+def test_etag_served(client):
+    response = client.get("/static")
+    assert response.status_code == 200
+    assert response.headers["etag"] == ETAG
+    assert response.content == BODY
+
+
+@pytest.mark.parametrize("if_none_match", [ETAG, f'"other", {ETAG}', f"W/{ETAG}", "*"])
+def test_matching_if_none_match_returns_304(client, if_none_match):
+    response = client.get("/static", headers={"If-None-Match": if_none_match})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == ETAG
+
+
+def test_stale_if_none_match_returns_body(client):
+    response = client.get("/static", headers={"If-None-Match": '"model-info-old"'})
+    assert response.status_code == 200
+    assert response.content == BODY
+
+
+def test_gzip_negotiation(client, monkeypatch):
+    monkeypatch.setattr(responses, "brotli", None)
+    response = client.get("/large", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.json() == LARGE
+
+
+def test_refused_encoding_not_used(client):
+    response = client.get("/large", headers={"Accept-Encoding": "gzip;q=0, br;q=0"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == LARGE
@@ -0,0 +1,100 @@
+"""
+Tests for the retraining pipeline
+"""
+import joblib
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from app.database import Base
+from app.ml.drift import load_reference
+from app.ml.model import CLASSES, FEATURE_COLUMNS, GENDERS, PLATFORM_MAPPING, WellBeingPredictor
+from app.ml.retrain import retrain, stream_chunks
+from app.models.database_models import Assessment
+
+# Shared-cache in-memory DB, reachable from retrain's own engine
+DATABASE_URL = "sqlite:///file:retrain_test?mode=memory&cache=shared&uri=true"
+
+N_VALID = 300
+
+BAD_ROWS = [
+    {"age": None},
+    {"age": "abc"},
+    {"gender": "Robot"},
+    {"primary_platform": "MySpace"},
+    {"prediction": "Great"}
+]
+
+
+def assessment(rng, **overrides) -> dict:
+    sleep, stress = int(rng.integers(1, 11)), int(rng.integers(1, 11))
+    row = {
+        "user_id": "u",
+        "age": int(rng.integers(10, 80)),
+        "gender": str(rng.choice(GENDERS)),
+        "daily_screen_time_hrs": float(rng.uniform(0, 12)),
+        "primary_platform": str(rng.choice(list(PLATFORM_MAPPING))),
+        "sleep_quality": sleep,
+        "stress_level": stress,
+        "days_without_social_media": int(rng.integers(0, 30)),
+        "exercise_frequency_week": int(rng.integers(0, 14)),
+        "prediction": "At Risk" if stress - sleep > 2 else "Balanced" if sleep - stress > 2 else "Moderate"
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.fixture(scope="module")
+def database():
+    engine = create_engine(DATABASE_URL)
+    keepalive = engine.connect()  # The in-memory DB lives while a connection is open
+    Base.metadata.create_all(bind=engine)
+
+    rng = np.random.default_rng(0)
+    with Session(engine) as db:
+        db.add_all(Assessment(**assessment(rng)) for _ in range(N_VALID))
+        db.commit()
+    # Insert bad rows with raw SQL so SQLite keeps the non-numeric text
+    with engine.begin() as conn:
+        for overrides in BAD_ROWS:
+            row = assessment(rng, **overrides)
+            columns = ", ".join(row)
+            conn.execute(
+                text(f"INSERT INTO assessments ({columns}) VALUES ({', '.join(':' + c for c in row)})"),
+                row
+            )
+
+    yield DATABASE_URL
+    keepalive.close()
+
+
+def test_stream_chunks_drops_bad_rows(database):
+    with create_engine(database).connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM assessments")).scalar() == N_VALID + len(BAD_ROWS)
+
+    chunks = list(stream_chunks(database, chunk_size=64))
+
+    assert sum(len(labels) for _, labels in chunks) == N_VALID
+    for features, labels in chunks:
+        assert list(features.columns) == FEATURE_COLUMNS
+        assert not features.isna().any().any()
+        assert set(labels) <= set(CLASSES)
+
+
+def test_retrain_exports_loadable_artifacts(database, tmp_path):
+    metadata = retrain(database, tmp_path, chunk_size=100, folds=3, workers=2)
+
+    assert metadata["params"]["n_neighbors"] > 0
+    assert (tmp_path / "model_metadata.pkl").exists()
+    assert not list(tmp_path.glob(".retrain-*"))
+
+    for index_type in ["exact", "ivf"]:
+        predictor = WellBeingPredictor(str(tmp_path), index_type=index_type)
+        assert set(predictor.model.classes_) == set(CLASSES)
+        assert predictor.get_model_info()["training_samples"] == metadata["training_samples"]
+
+    reference = joblib.load(tmp_path / "drift_reference.pkl")
+    assert reference.model_version == predictor.model_version
+    assert reference.count == N_VALID
+    assert reference.source == "training_rows"
+    assert load_reference(predictor) is not None